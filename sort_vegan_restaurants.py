@@ -1,125 +1,320 @@
 import re
+import atexit
 import json
 import os
-from datetime import datetime
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
+from decimal import Decimal
+from itertools import islice, repeat
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+JSON_DECODE_ERRORS = (json.JSONDecodeError,) if ijson is None else (json.JSONDecodeError, ijson.JSONError)
 
 # --- Configuration ---
 input_file_name = 'results.json'
 output_file_name = 'parsed_restaurants_paris.json'
 error_log_file = 'parsing_errors.log'
+numeric_output_file_name = 'parsed_restaurants_paris_numeric.npz'
 # -------------------
 
+INT64_MAX = 2**63 - 1
+
+# Leading cuisine run (plus an optional trailing comma), then a description
+# starting with a capital letter. Kept free of nested quantifiers so matching
+# stays linear in the length of the content; from Python 3.11 on, possessive
+# quantifiers also stop the engine from ever backtracking into a run.
+if sys.version_info >= (3, 11):
+    _RE_CUIS = re.compile(r"\A([A-Za-z0-9\-/ ]++(?:,\s*+)?+)\s*+([A-Z].*+)?+", re.DOTALL)
+else:
+    _RE_CUIS = re.compile(r"\A([A-Za-z0-9\-/ ]+(?:,\s*)?)\s*([A-Z].*)?", re.DOTALL)
+
+def preview_json(item, limit):
+    """Return the first `limit` characters of item's JSON without encoding all of it."""
+    # Encoded strings are never shorter than their source, so clipping top-level
+    # strings to `limit` keeps the preview identical while bounding the work.
+    if isinstance(item, str):
+        item = item[:limit]
+    elif isinstance(item, dict):
+        item = {k: v[:limit] if isinstance(v, str) else v for k, v in item.items()}
+    chunks = []
+    size = 0
+    for chunk in json.JSONEncoder(ensure_ascii=False).iterencode(item):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= limit:
+            break
+    return "".join(chunks)[:limit]
+
+_error_log = None  # opened on first use, closed at exit
+
+def _close_error_log():
+    if _error_log is not None:
+        _error_log.close()
+
+atexit.register(_close_error_log)
+
 def log_error(message, item=None):
     """Log errors to a file with timestamp for debugging."""
-    with open(error_log_file, 'a', encoding='utf-8') as f:
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        f.write(f"[{timestamp}] {message}\n")
-        if item:
-            f.write(f"Item content: {json.dumps(item, ensure_ascii=False)[:500]}...\n")
-        f.write("-" * 80 + "\n")
+    global _error_log
+    if _error_log is None:
+        _error_log = open(error_log_file, 'a', encoding='utf-8', buffering=1 << 16)
+    timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+    _error_log.write(f"[{timestamp}] {message}\n")
+    if item:
+        _error_log.write(f"Item content: {preview_json(item, 500)}...\n")
+    _error_log.write("-" * 80 + "\n")
+
+@dataclass(slots=True)
+class Restaurant:
+    """Parsed fields of one restaurant listing."""
+    restaurant_name: str | None = None
+    rating: float | None = None
+    num_reviews: int | None = None
+    establishment_type: str | None = None
+    status: str | None = None
+    is_partner: bool = False
+    cuisines_features: list = field(default_factory=list)
+    description: str | None = None
+    phone_number: str | None = None
+    address: str | None = None
+    reviews: list = field(default_factory=list)
+
+RESTAURANT_FIELDS = tuple(f.name for f in fields(Restaurant))
+
+def load_json(f):
+    """Load JSON from a binary file, using orjson when available."""
+    content = f.read()
+    if orjson is not None:
+        # Not lossless: orjson silently loads integers beyond 64 bits as floats
+        # (123456789012345678901234567890 -> 1.2345678901234568e+29), where the
+        # stdlib keeps them exact. Only inputs orjson rejects outright, such as
+        # out-of-range floats or lone surrogates, fall back to the stdlib below.
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(content.decode('utf-8'))
+
+def dump_json(obj):
+    """Serialize to indented UTF-8 JSON bytes, using orjson when available."""
+    if orjson is not None:
+        # orjson never escapes non-ASCII, matching ensure_ascii=False. Output can
+        # still differ from json.dumps: NaN and Infinity are written as null,
+        # and some floats are formatted differently (1e17 for 1e+17, 0.00001
+        # for 1e-05). Only values orjson rejects outright, such as integers
+        # beyond 64 bits, fall back to the stdlib below.
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+_VALUE_START_EVENTS = frozenset(("start_map", "start_array", "string", "number", "boolean", "null"))
+
+def _selection1_events(f, occurrence):
+    """Yield the ijson parse events of the given top-level 'selection1' array."""
+    # Parsed with the same options as the counting pass in read_items, so any
+    # parse error surfaces there before work starts. use_float is left off
+    # because yajl2_c then rejects integers beyond 64 bits and floats beyond
+    # double range; non-integers arrive as Decimal and become floats here,
+    # as json.loads would produce.
+    seen = 0
+    for prefix, event, value in ijson.parse(f):
+        if event == "number" and type(value) is Decimal:
+            value = float(value)
+        if prefix == "selection1":
+            if event in _VALUE_START_EVENTS:
+                seen += 1
+            elif seen == occurrence and event == "end_array":
+                yield prefix, event, value
+                return
+        if seen == occurrence and (prefix == "selection1" or prefix.startswith("selection1.")):
+            yield prefix, event, value
+
+def read_items(f):
+    """Return (items, total_items) for the 'selection1' list of a binary file.
+
+    With ijson the entries are counted in a first pass that builds no objects,
+    then streamed one by one; otherwise the whole file is loaded. total_items
+    is None if there is no 'selection1' list.
+    """
+    if ijson is None:
+        data = load_json(f)
+        if not isinstance(data, dict) or not isinstance(data.get("selection1"), list):
+            return None, None
+        return data["selection1"], len(data["selection1"])
+
+    # A repeated 'selection1' key keeps only its last value, as json/orjson do,
+    # so count the entries of that occurrence and stream only its events
+    occurrences = 0
+    total_items = None
+    for prefix, event, _ in ijson.parse(f):
+        if prefix == "selection1":
+            if event in _VALUE_START_EVENTS:
+                occurrences += 1
+                total_items = 0 if event == "start_array" else None
+        elif total_items is not None and prefix == "selection1.item" and \
+                event in _VALUE_START_EVENTS:
+            total_items += 1
+    if total_items is None:
+        return None, None
+    f.seek(0)
+    return ijson.items(_selection1_events(f, occurrences), "selection1.item"), total_items
+
+def iter_batches(iterable, size):
+    """Yield successive lists of up to `size` elements from an iterable."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def write_json_array(f, items):
+    """Write items to a binary file as an indented JSON array, one item at a time."""
+    f.write(b'[')
+    empty = True
+    for item in items:
+        f.write(b'\n  ' if empty else b',\n  ')
+        # Nest the item's own indentation one level inside the array
+        f.write(dump_json(item).replace(b'\n', b'\n  '))
+        empty = False
+    f.write(b']' if empty else b'\n]')
+
+def write_numeric_columns(path, ratings, review_counts):
+    """Save the rating and num_reviews columns as float32/int64 arrays in an .npz file."""
+    # The array buffers are shared with numpy, not copied
+    np.savez(
+        path,
+        rating=np.frombuffer(ratings, dtype=np.float32),
+        num_reviews=np.frombuffer(review_counts, dtype=np.int64),
+    )
+
+def parse_rating(line):
+    """Parse a '<float> (<int>)' line into (rating, num_reviews), or None."""
+    head, sep, tail = line.partition('(')
+    number = head.rstrip()
+    if not sep or number == head:  # '(' missing or not preceded by whitespace
+        return None
+    whole, dot, frac = number.partition('.')
+    count, closed, _ = tail.partition(')')
+    if dot and whole.isdecimal() and frac.isdecimal() and closed and count.isdecimal():
+        return float(number), int(count)
+    return None
+
+def is_phone_number(line):
+    """Check that a line starts like '+<1-3 digits>-<digits>'."""
+    if line[:1] != '+':
+        return False
+    country, sep, rest = line[1:].partition('-')
+    return bool(sep) and 1 <= len(country) <= 3 and country.isdecimal() and rest[:1].isdecimal()
 
 def parse_restaurant_item(item, index, total_items):
-    """Parse a single restaurant item and return structured data."""
-    restaurant_data = {
-        "restaurant_name": None,
-        "rating": None,
-        "num_reviews": None,
-        "establishment_type": None,
-        "status": None,
-        "is_partner": False,
-        "cuisines_features": [],
-        "description": None,
-        "phone_number": None,
-        "address": None,
-        "reviews": []  # New: List to store reviews
-    }
+    """Parse a single restaurant item.
+
+    Returns (restaurant_data, errors), where restaurant_data is None if the
+    item was skipped and errors is a list of (message, item) pairs for the
+    caller to log. Nothing is written from here, so items can be parsed in
+    worker processes.
+    """
+    errors = []
+    restaurant_data = Restaurant()
 
     try:
         # Check if 'name' key exists
         if "name" not in item:
-            log_error(f"Item {index+1} missing 'name' key, skipping.", item)
-            return None
+            errors.append((f"Item {index+1} missing 'name' key, skipping.", item))
+            return None, errors
 
         # Split text into lines, removing empty ones
-        lines = [line.strip() for line in item["name"].split('\n') if line.strip()]
+        lines = [line for line in (raw.strip() for raw in item["name"].split('\n')) if line]
         if not lines:
-            log_error(f"Item {index+1} has empty 'name' content, skipping.", item)
-            return None
+            errors.append((f"Item {index+1} has empty 'name' content, skipping.", item))
+            return None, errors
 
         # --- Step 1: Parse top elements ---
         if len(lines) >= 1:
-            restaurant_data["restaurant_name"] = lines[0]
+            restaurant_data.restaurant_name = lines[0]
         
         if len(lines) >= 2:
-            rating_reviews_match = re.match(r'(\d+\.\d+)\s+\((\d+)\)', lines[1])
-            if rating_reviews_match:
-                restaurant_data["rating"] = float(rating_reviews_match.group(1))
-                restaurant_data["num_reviews"] = int(rating_reviews_match.group(2))
+            rating_reviews = parse_rating(lines[1])
+            if rating_reviews:
+                restaurant_data.rating, restaurant_data.num_reviews = rating_reviews
             else:
-                log_error(f"Item {index+1}: Failed to parse rating/reviews from '{lines[1]}'.")
+                errors.append((f"Item {index+1}: Failed to parse rating/reviews from '{lines[1]}'.", None))
 
         if len(lines) >= 3:
-            restaurant_data["establishment_type"] = lines[2]
+            restaurant_data.establishment_type = lines[2]
 
         # --- Step 2: Parse bottom elements (phone, address, reviews) ---
+        # "Read Reviews" closes the listing, so check the raw text once and
+        # scan backwards from the end (usually a single step) to find its line.
         read_reviews_idx = -1
-        for i_line, line in enumerate(lines):
-            if "Read Reviews" in line:
-                read_reviews_idx = i_line
-                break
+        if "Read Reviews" in item["name"]:
+            read_reviews_idx = next(
+                (k for k in range(len(lines) - 1, -1, -1) if "Read Reviews" in lines[k]), -1
+            )
 
         if read_reviews_idx != -1:
             if read_reviews_idx - 1 >= 0:
-                restaurant_data["address"] = lines[read_reviews_idx - 1]
+                restaurant_data.address = lines[read_reviews_idx - 1]
             
             if read_reviews_idx - 2 >= 0:
                 potential_phone = lines[read_reviews_idx - 2]
-                if re.match(r'\+\d{1,3}-\d+', potential_phone):
-                    restaurant_data["phone_number"] = potential_phone
+                if is_phone_number(potential_phone):
+                    restaurant_data.phone_number = potential_phone
                 else:
-                    log_error(f"Item {index+1}: Invalid phone number format '{potential_phone}'.")
+                    errors.append((f"Item {index+1}: Invalid phone number format '{potential_phone}'.", None))
 
         # --- Step 3: Parse middle content ---
-        start_content_idx = 3
-        end_content_idx = read_reviews_idx if read_reviews_idx != -1 else len(lines)
-        if restaurant_data["phone_number"]:
-            end_content_idx -= 1
-        if restaurant_data["address"]:
-            end_content_idx -= 1
-
-        if start_content_idx < end_content_idx:
-            middle_content_lines = lines[start_content_idx:end_content_idx]
-            current_middle_idx = 0
-
-            # Status
-            if current_middle_idx < len(middle_content_lines) and \
-               middle_content_lines[current_middle_idx] in ["Closed", "Open Now"]:
-                restaurant_data["status"] = middle_content_lines[current_middle_idx]
-                current_middle_idx += 1
-
-            # Partner
-            if current_middle_idx < len(middle_content_lines) and \
-               middle_content_lines[current_middle_idx] == "Partner":
-                restaurant_data["is_partner"] = True
-                current_middle_idx += 1
-
-            # Remaining content: cuisines/features and description
-            remaining_content = " ".join(middle_content_lines[current_middle_idx:]).strip()
-            if remaining_content:
-                cuisines_desc_match = re.match(
-                    r"((?:[A-Za-z0-9\-\/ ]+(?:,\s*)?)+?)\s*([A-Z].*)?",
-                    remaining_content,
-                    re.DOTALL
-                )
-                if cuisines_desc_match:
-                    cuisines_raw = cuisines_desc_match.group(1).strip()
-                    restaurant_data["cuisines_features"] = [c.strip() for c in cuisines_raw.split(',') if c.strip()]
-                    restaurant_data["description"] = cuisines_desc_match.group(2).strip() if cuisines_desc_match.group(2) else None
+        # Middle lines run from index 3 up to the phone/address block. Walk
+        # them with a cursor, advancing through status -> partner -> content,
+        # instead of slicing them into a separate list.
+        end = read_reviews_idx if read_reviews_idx != -1 else len(lines)
+        if restaurant_data.phone_number:
+            end -= 1
+        if restaurant_data.address:
+            end -= 1
+        k = 3
+
+        # Status
+        if k < end and lines[k] in ("Closed", "Open Now"):
+            restaurant_data.status = lines[k]
+            k += 1
+
+        # Partner
+        if k < end and lines[k] == "Partner":
+            restaurant_data.is_partner = True
+            k += 1
+
+        # Remaining content: cuisines/features and description
+        if k < end:
+            # Lines are already stripped and non-empty; usually there is just one left
+            remaining_content = lines[k] if end - k == 1 else " ".join(lines[k:end])
+            cuisines_desc_match = _RE_CUIS.match(remaining_content)
+            if cuisines_desc_match:
+                cuisines_raw = cuisines_desc_match.group(1).strip()
+                restaurant_data.cuisines_features = [c.strip() for c in cuisines_raw.split(',') if c.strip()]
+                restaurant_data.description = cuisines_desc_match.group(2).strip() if cuisines_desc_match.group(2) else None
+            else:
+                if ',' in remaining_content:
+                    restaurant_data.cuisines_features = [c.strip() for c in remaining_content.split(',') if c.strip()]
                 else:
-                    if ',' in remaining_content:
-                        restaurant_data["cuisines_features"] = [c.strip() for c in remaining_content.split(',') if c.strip()]
-                    else:
-                        restaurant_data["description"] = remaining_content
+                    restaurant_data.description = remaining_content
 
         # --- Step 4: Parse reviews ---
         if "reviews" in item and item["reviews"]:
@@ -129,54 +324,43 @@ def parse_restaurant_item(item, index, total_items):
                 for review in reviews:
                     if isinstance(review, dict):
                         # Expect keys like 'text', 'rating', 'date' (if available)
-                        restaurant_data["reviews"].append({
+                        restaurant_data.reviews.append({
                             "text": review.get("text", ""),
                             "rating": float(review["rating"]) if review.get("rating") else None,
                             "date": review.get("date")
                         })
                     elif isinstance(review, str):
                         # Handle plain text reviews
-                        restaurant_data["reviews"].append({"text": review.strip()})
+                        restaurant_data.reviews.append({"text": review.strip()})
             elif isinstance(reviews, str):
                 # Handle reviews as a single text block
-                review_lines = [r.strip() for r in reviews.split('\n') if r.strip()]
-                restaurant_data["reviews"] = [{"text": r} for r in review_lines]
+                review_lines = [r for r in (raw.strip() for raw in reviews.split('\n')) if r]
+                restaurant_data.reviews = [{"text": r} for r in review_lines]
         else:
-            log_error(f"Item {index+1}: No reviews found or empty reviews field.")
+            errors.append((f"Item {index+1}: No reviews found or empty reviews field.", None))
 
-        return restaurant_data
+        return restaurant_data, errors
 
     except Exception as e:
-        log_error(f"Item {index+1} processing failed: {str(e)}", item)
-        return None
+        errors.append((f"Item {index+1} processing failed: {str(e)}", item))
+        return None, errors
 
 def remove_null_fields(parsed_restaurants):
-    """Remove fields that are null for all items, unless at least one item has a non-null value."""
+    """Convert Restaurant objects to dicts, dropping fields that are null or empty for every item."""
     if not parsed_restaurants:
-        return parsed_restaurants
+        return []
 
-    # Get all possible fields from the first restaurant
-    fields = list(parsed_restaurants[0].keys())
-    fields_to_remove = []
-
-    # Check each field
-    for field in fields:
-        all_null = True
+    # Each field's scan stops at its first populated value, so this is cheap
+    # unless a field is null almost everywhere
+    kept_fields = []
+    for name in RESTAURANT_FIELDS:
         for restaurant in parsed_restaurants:
-            if restaurant[field] is not None and not (
-                isinstance(restaurant[field], (list, dict)) and not restaurant[field]
-            ):
-                all_null = False
+            value = getattr(restaurant, name)
+            if value is not None and not (isinstance(value, (list, dict)) and not value):
+                kept_fields.append(name)
                 break
-        if all_null:
-            fields_to_remove.append(field)
-
-    # Remove fields that are null for all items
-    for restaurant in parsed_restaurants:
-        for field in fields_to_remove:
-            restaurant.pop(field, None)
 
-    return parsed_restaurants
+    return [{name: getattr(restaurant, name) for name in kept_fields} for restaurant in parsed_restaurants]
 
 def main():
     parsed_restaurants = []
@@ -186,48 +370,83 @@ def main():
 
     try:
         print(f"Attempting to load data from: {input_file_path}")
-        with open(input_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        if "selection1" not in data or not isinstance(data["selection1"], list):
-            print(f"Error: Input JSON does not contain a 'selection1' list.")
-            return
-
-        total_items = len(data["selection1"])
-        if total_items == 0:
-            print("Error: No restaurant entries found in 'selection1'.")
-            return
-
-        print(f"Found {total_items} restaurant entries to process.")
-
-        for i, item in enumerate(data["selection1"]):
-            if (i + 1) % max(100, total_items // 10) == 0 or i == total_items - 1:
-                progress_percentage = ((i + 1) / total_items) * 100
-                print(f"Processing: {progress_percentage:.2f}% ({i + 1}/{total_items} items processed)")
-
-            restaurant_data = parse_restaurant_item(item, i, total_items)
-            if restaurant_data:
-                parsed_restaurants.append(restaurant_data)
+        with open(input_file_path, 'rb') as f:
+            items, total_items = read_items(f)
+            if total_items is None:
+                print(f"Error: Input JSON does not contain a 'selection1' list.")
+                return
+
+            if total_items == 0:
+                print("Error: No restaurant entries found in 'selection1'.")
+                return
+
+            print(f"Found {total_items} restaurant entries to process.")
+
+            # Items are independent, so parse them across all cores. Errors come
+            # back with each result and are logged here, in item order. Items are
+            # handed over one batch at a time so a streamed input never has to be
+            # held in memory as a whole.
+            append = parsed_restaurants.append
+            # Numeric columns kept side by side for analytics (only saved with numpy);
+            # NaN / -1 mark missing values, and counts too large for int64
+            collect_numeric = np is not None
+            ratings = array('f')
+            review_counts = array('q')
+            # Progress is only useful on a terminal; skip it when output is redirected
+            show_progress = sys.stdout.isatty()
+            progress_every = max(100, total_items // 10)
+            chunksize = 256
+            batch_size = chunksize * (os.cpu_count() or 1)
+            i = 0
+            with ProcessPoolExecutor() as executor:
+                for batch in iter_batches(items, batch_size):
+                    results = executor.map(
+                        parse_restaurant_item,
+                        batch,
+                        range(i, i + len(batch)),
+                        repeat(total_items),
+                        chunksize=chunksize,
+                    )
+                    for restaurant_data, errors in results:
+                        if show_progress and ((i + 1) % progress_every == 0 or i == total_items - 1):
+                            progress_percentage = ((i + 1) / total_items) * 100
+                            print(f"Processing: {progress_percentage:.2f}% ({i + 1}/{total_items} items processed)")
+
+                        for message, error_item in errors:
+                            log_error(message, error_item)
+                        if restaurant_data:
+                            append(restaurant_data)
+                            if collect_numeric:
+                                ratings.append(float('nan') if restaurant_data.rating is None else restaurant_data.rating)
+                                num_reviews = restaurant_data.num_reviews
+                                review_counts.append(
+                                    num_reviews if num_reviews is not None and num_reviews <= INT64_MAX else -1
+                                )
+                        i += 1
 
         if not parsed_restaurants:
             print("Error: No valid restaurant data parsed.")
             return
 
-        # Remove fields that are null for all items
+        # Convert to dicts, removing fields that are null for all items
         parsed_restaurants = remove_null_fields(parsed_restaurants)
 
         # Save output
-        output_json = json.dumps(parsed_restaurants, indent=2, ensure_ascii=False)
-        with open(output_file_path, 'w', encoding='utf-8') as f:
-            f.write(output_json)
+        with open(output_file_path, 'wb') as f:
+            write_json_array(f, parsed_restaurants)
         
         print(f"\nSuccessfully parsed {len(parsed_restaurants)}/{total_items} restaurants and saved to: {output_file_path}")
         if len(parsed_restaurants) < total_items:
             print(f"Note: {total_items - len(parsed_restaurants)} items were skipped due to errors. Check '{error_log_file}' for details.")
 
+        if collect_numeric:
+            numeric_output_file_path = os.path.join(current_working_directory, numeric_output_file_name)
+            write_numeric_columns(numeric_output_file_path, ratings, review_counts)
+            print(f"Saved rating/num_reviews columns to: {numeric_output_file_path}")
+
     except FileNotFoundError:
         print(f"Error: Input file not found at '{input_file_path}'.")
-    except json.JSONDecodeError:
+    except JSON_DECODE_ERRORS:
         print(f"Error: Could not decode JSON from '{input_file_path}'.")
     except KeyboardInterrupt:
         print("\nScript interrupted by user.")